@@ -1,5 +1,9 @@
         let allStudents = [];
         let filteredStudents = [];
+        let changeSource = null;
+        // Lookups kept between change events so patches cost O(changes)
+        let studentsByRoll = new Map();
+        let rowsByRoll = new Map();
 
         // Check authentication on page load
         window.onload = function() {
@@ -24,6 +28,9 @@
         };
 
         function logout() {
+            if (changeSource) {
+                changeSource.close();
+            }
             sessionStorage.clear();
             window.location.href = 'index.html';
         }
@@ -38,9 +45,9 @@
                 
                 if (response.ok) {
                     allStudents = data.students;
-                    filteredStudents = [...allStudents];
-                    displayStudents();
-                    updateStats();
+                    studentsByRoll = new Map(allStudents.map(student => [student.roll_no, student]));
+                    filterStudents();
+                    subscribeToChanges(data.event_id);
                     console.log('Students loaded successfully:', allStudents.length);
                 } else {
                     console.error('Failed to load students:', data);
@@ -58,57 +65,123 @@
                 const data = await response.json();
                 
                 if (response.ok && data.topper) {
-                    document.getElementById('topperName').textContent = data.topper.name;
-                    document.getElementById('topperRoll').textContent = data.topper.roll_no;
-                    document.getElementById('topperCGPA').textContent = data.topper.cgpa;
-                    document.getElementById('topperAttendance').textContent = data.topper.attendance + '%';
-                    document.getElementById('topperGrade').textContent = data.topper.grade;
+                    showTopper(data.topper);
                 }
             } catch (error) {
                 console.error('Error loading topper:', error);
             }
         }
 
+        function subscribeToChanges(eventId) {
+            if (changeSource) {
+                changeSource.close();
+            }
+            changeSource = new EventSource(`/api/changes?last_event_id=${encodeURIComponent(eventId)}`);
+            changeSource.addEventListener('add', event => applyChange(JSON.parse(event.data)));
+            changeSource.addEventListener('update', event => applyChange(JSON.parse(event.data)));
+            changeSource.addEventListener('resync', () => {
+                // Too far behind to patch, fetch the full roster again
+                changeSource.close();
+                changeSource = null;
+                loadStudents();
+                loadTopper();
+            });
+        }
+
+        function applyChange(change) {
+            // Only touch the changed rows so selections and typed values elsewhere survive
+            const tbody = document.getElementById('studentTableBody');
+            change.students.forEach(student => {
+                const existing = studentsByRoll.get(student.roll_no);
+                if (existing) {
+                    // Same object is in filteredStudents, so updating it in place updates both
+                    Object.assign(existing, student);
+                    const row = rowsByRoll.get(student.roll_no);
+                    if (row) {
+                        updateRowCells(row, existing);
+                    }
+                } else {
+                    allStudents.push(student);
+                    studentsByRoll.set(student.roll_no, student);
+                    if (matchesFilters(student)) {
+                        filteredStudents.push(student);
+                        tbody.appendChild(createStudentRow(student));
+                    }
+                }
+            });
+            if (change.topper) {
+                showTopper(change.topper);
+            }
+            updateStats();
+        }
+
+        function showTopper(topper) {
+            document.getElementById('topperName').textContent = topper.name;
+            document.getElementById('topperRoll').textContent = topper.roll_no;
+            document.getElementById('topperCGPA').textContent = topper.cgpa;
+            document.getElementById('topperAttendance').textContent = topper.attendance + '%';
+            document.getElementById('topperGrade').textContent = topper.grade;
+        }
+
         function displayStudents() {
             const tbody = document.getElementById('studentTableBody');
             tbody.innerHTML = '';
 
+            rowsByRoll = new Map();
             filteredStudents.forEach(student => {
-                const row = document.createElement('tr');
-                row.innerHTML = `
-                    <td><input type="checkbox" class="student-checkbox" data-roll="${student.roll_no}" onchange="updateSelectedCount()"></td>
-                    <td>${student.roll_no}</td>
-                    <td>${student.name}</td>
-                    <td>${student.degree}</td>
-                    <td>${student.year_of_registration}</td>
-                    <td>${student.marks}</td>
-                    <td><input type="number" class="new-marks" data-roll="${student.roll_no}" min="0" max="100" step="0.1"></td>
-                    <td>${student.cgpa}</td>
-                    <td><input type="number" class="new-cgpa" data-roll="${student.roll_no}" min="0" max="10" step="0.01"></td>
-                    <td>${student.attendance}%</td>
-                    <td><span style="background: #667eea; color: white; padding: 4px 12px; border-radius: 12px;">${student.grade}</span></td>
-                `;
-                tbody.appendChild(row);
+                tbody.appendChild(createStudentRow(student));
             });
         }
 
+        function createStudentRow(student) {
+            const row = document.createElement('tr');
+            row.dataset.roll = student.roll_no;
+            row.innerHTML = renderStudentRow(student);
+            rowsByRoll.set(student.roll_no, row);
+            return row;
+        }
+
+        function updateRowCells(row, student) {
+            row.querySelector('.cell-marks').textContent = student.marks;
+            row.querySelector('.cell-cgpa').textContent = student.cgpa;
+            row.querySelector('.cell-grade').textContent = student.grade;
+        }
+
+        function renderStudentRow(student) {
+            return `
+                <td><input type="checkbox" class="student-checkbox" data-roll="${student.roll_no}" onchange="updateSelectedCount()"></td>
+                <td>${student.roll_no}</td>
+                <td>${student.name}</td>
+                <td>${student.degree}</td>
+                <td>${student.year_of_registration}</td>
+                <td class="cell-marks">${student.marks}</td>
+                <td><input type="number" class="new-marks" data-roll="${student.roll_no}" min="0" max="100" step="0.1"></td>
+                <td class="cell-cgpa">${student.cgpa}</td>
+                <td><input type="number" class="new-cgpa" data-roll="${student.roll_no}" min="0" max="10" step="0.01"></td>
+                <td>${student.attendance}%</td>
+                <td><span class="cell-grade" style="background: #667eea; color: white; padding: 4px 12px; border-radius: 12px;">${student.grade}</span></td>
+            `;
+        }
+
         function filterStudents() {
+            filteredStudents = allStudents.filter(matchesFilters);
+
+            displayStudents();
+            updateStats();
+        }
+
+        function matchesFilters(student) {
             const courseFilter = document.getElementById('courseFilter').value;
             const yearFilter = document.getElementById('yearFilter').value;
             const searchFilter = document.getElementById('searchFilter').value.toLowerCase();
 
-            filteredStudents = allStudents.filter(student => {
-                const courseMatch = !courseFilter || student.degree === courseFilter;
-                const yearMatch = !yearFilter || student.year_of_registration.toString() === yearFilter;
-                const searchMatch = !searchFilter || 
-                    student.name.toLowerCase().includes(searchFilter) || 
-                    student.roll_no.toLowerCase().includes(searchFilter);
+            const courseMatch = !courseFilter || student.degree === courseFilter;
+            const yearMatch = !yearFilter || student.year_of_registration.toString() === yearFilter;
+            const searchMatch = !searchFilter || 
+                student.name.toLowerCase().includes(searchFilter) || 
+                student.roll_no.toLowerCase().includes(searchFilter);
 
-                return courseMatch && yearMatch && searchMatch;
-            });
-
-            displayStudents();
-            updateStats();
+            return courseMatch && yearMatch && searchMatch;
         }
 
         function updateStats() {
@@ -171,15 +244,17 @@
                     headers: {
                         'Content-Type': 'application/json',
                     },
-                    body: JSON.stringify({ updates: updates })
+                    body: JSON.stringify({
+                        updates: updates,
+                        faculty_id: sessionStorage.getItem('facultyId')
+                    })
                 });
 
                 const data = await response.json();
 
                 if (response.ok) {
+                    // The change feed patches the table and topper
                     showMessage(`Successfully updated ${data.updated_count} student(s)`, 'success');
-                    loadStudents();
-                    loadTopper();
                     deselectAll();
                 } else {
                     showMessage('Error updating marks', 'error');
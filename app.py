@@ -2,11 +2,14 @@
 Flask Web Server for Student Management System
 Integrates student management, faculty authentication, and web interface
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
+from datetime import datetime
 from student_management import StudentManagementSystem
 from faculty_auth import FacultyAuthSystem
+from change_feed import ChangeFeed
+from rate_limiter import MemoryBucketStore, RateLimiter
 
 app = Flask(__name__)
 CORS(app)
@@ -14,6 +17,36 @@ CORS(app)
 # Initialize systems
 sms = StudentManagementSystem()
 auth_system = FacultyAuthSystem()
+change_feed = ChangeFeed()
+sms.add_listener(change_feed.publish)
+
+# Login throttling: a burst of 10 attempts per IP (one more every 6 seconds)
+# and 5 per employee ID (one more a minute). Swap the store for a
+# RedisBucketStore to share buckets between workers.
+rate_limit_store = MemoryBucketStore(max_keys=10000)
+login_ip_limiter = RateLimiter(10, 1 / 6, rate_limit_store, name='login-ip')
+login_employee_limiter = RateLimiter(5, 1 / 60, rate_limit_store, name='login-employee')
+
+
+@app.before_request
+def throttle_login():
+    """Reject login bursts before they reach password verification"""
+    if request.endpoint != 'faculty_login' or request.method != 'POST':
+        return None
+    
+    allowed, retry_after = login_ip_limiter.check(request.remote_addr or 'unknown')
+    if allowed:
+        data = request.get_json(silent=True) or {}
+        employee_id = data.get('employee_id')
+        if employee_id:
+            allowed, retry_after = login_employee_limiter.check(str(employee_id))
+    
+    if allowed:
+        return None
+    response = jsonify({'error': 'Too many login attempts, try again later'})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
 
 # Serve static HTML files
 @app.route('/')
@@ -43,17 +76,81 @@ def get_student(roll_no):
         return jsonify({'error': 'Student not found'}), 404
 
 
+@app.route('/api/student/<roll_no>/history', methods=['GET'])
+def get_student_history(roll_no):
+    """Get the marks/CGPA history of a student, oldest first"""
+    student = sms.get_student_by_roll(roll_no)
+    
+    if student:
+        return jsonify({
+            'roll_no': roll_no,
+            'history': sms.get_marks_history(roll_no)
+        }), 200
+    else:
+        return jsonify({'error': 'Student not found'}), 404
+
+
+@app.route('/api/students/as-of', methods=['GET'])
+def get_students_as_of():
+    """Get the roster as it stood at a date (YYYY-MM-DD or ISO timestamp)"""
+    date = request.args.get('date', '')
+    
+    try:
+        when = datetime.fromisoformat(date)
+    except ValueError:
+        return jsonify({'error': 'Invalid or missing date, expected YYYY-MM-DD'}), 400
+    
+    if len(date) == 10:
+        # A bare date means the end of that day
+        when = when.replace(hour=23, minute=59, second=59, microsecond=999999)
+    
+    return jsonify({'students': sms.get_students_as_of(when)}), 200
+
+
 @app.route('/api/students', methods=['GET'])
 def get_all_students():
     """Get all students"""
+    # Read the version first: replaying a change already in the roster is harmless
+    version = sms.version
     students_data = [student.to_dict() for student in sms.students]
+    return jsonify({
+        'students': students_data,
+        'version': version,
+        'event_id': change_feed.current_event_id(version)
+    }), 200
+
+
+@app.route('/api/changes', methods=['GET'])
+def student_changes():
+    """Server-sent event stream of student changes
+    Resumes after the Last-Event-ID header or the last_event_id query parameter"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(
+        stream_with_context(change_feed.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/students/search', methods=['GET'])
+def search_students():
+    """Search students by name or roll number"""
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 20, type=int)
+    
+    if not query:
+        return jsonify({'error': 'Search query required'}), 400
+    
+    limit = max(1, min(limit, 100))
+    students = sms.search_students(query, limit)
+    students_data = [student.to_dict() for student in students]
     return jsonify({'students': students_data}), 200
 
 
 @app.route('/api/topper', methods=['GET'])
 def get_topper():
     """Get class topper based on CGPA and attendance"""
-    topper = sms.find_topper()
+    topper = sms.topper
     
     if topper:
         return jsonify({'topper': topper.to_dict()}), 200
@@ -109,22 +206,10 @@ def update_marks():
     if not updates:
         return jsonify({'error': 'No updates provided'}), 400
     
-    updated_count = 0
-    for update in updates:
-        roll_no = update.get('roll_no')
-        new_marks = update.get('marks')
-        new_cgpa = update.get('cgpa')
-        
-        student = sms.get_student_by_roll(roll_no)
-        if student:
-            if new_marks is not None:
-                student.marks = new_marks
-            if new_cgpa is not None:
-                student.cgpa = new_cgpa
-                student.grade = student.calculate_grade()
-            updated_count += 1
-    
-    sms.save_students()
+    try:
+        updated_count = sms.update_marks_bulk(updates, faculty_id=data.get('faculty_id'))
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
     
     return jsonify({
         'success': True,
@@ -144,7 +229,8 @@ def add_student():
             marks=float(data['marks']),
             cgpa=float(data['cgpa']),
             attendance=float(data['attendance']),
-            degree=data['degree']
+            degree=data['degree'],
+            faculty_id=data.get('faculty_id')
         )
         return jsonify({
             'success': True,
@@ -152,6 +238,10 @@ def add_student():
         }), 201
     except KeyError as e:
         return jsonify({'error': f'Missing required field: {str(e)}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -162,14 +252,14 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'total_students': len(sms.students),
+        'total_students': sms.student_count(),
         'total_faculty': len(auth_system.faculty_list)
     }), 200
 
 
 def initialize_data():
     """Initialize sample data if no data exists"""
-    if len(sms.students) == 0:
+    if sms.student_count() == 0:
         print("Initializing sample student data...")
         sample_students = [
             ("20240101", "Rahul Kumar", 85.5, 8.5, 92.0, "B.Tech"),
@@ -209,7 +299,7 @@ if __name__ == '__main__':
     initialize_data()
     
     print("\nServer Information:")
-    print(f"Total Students: {len(sms.students)}")
+    print(f"Total Students: {sms.student_count()}")
     print(f"Total Faculty: {len(auth_system.faculty_list)}")
     print("\nSample Faculty Credentials:")
     print("Employee ID: EMP001, Password: faculty123")
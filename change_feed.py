@@ -0,0 +1,120 @@
+"""
+Student Change Feed
+Fans out StudentManagementSystem change events to server-sent event (SSE) clients
+"""
+import json
+import queue
+import threading
+import uuid
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+
+RESYNC_MESSAGE = 'event: resync\ndata: {"type": "resync"}\n\n'
+
+
+class ChangeFeed:
+    """Broadcasts change events to subscribers and keeps a short replay buffer
+
+    Each subscriber gets its own bounded queue, so publishing an event costs
+    one queue put per connected client. Event IDs are '<epoch>-<version>';
+    clients that reconnect with a Last-Event-ID inside the replay buffer get
+    the missed events, anyone further behind (or from before a server
+    restart, or too slow to drain their queue) is told to resync.
+    """
+
+    def __init__(self, history_size: int = 256, queue_size: int = 256):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.history: deque = deque(maxlen=history_size)
+        self.queue_size = queue_size
+        self.subscribers: List[queue.Queue] = []
+        self.lock = threading.Lock()
+
+    def current_event_id(self, version: int) -> str:
+        """Event ID a client should resume from after loading data at version"""
+        return f"{self.epoch}-{version}"
+
+    def publish(self, event: Dict):
+        """Record an event and push it to every subscriber"""
+        event = dict(event, id=self.current_event_id(event['version']))
+        # Serialize once, not once per subscriber
+        message = format_sse(event)
+        with self.lock:
+            self.history.append((event['version'], message))
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Slow client: drop it and let it resync on reconnect
+                    self.subscribers.remove(subscriber)
+                    self._force_resync(subscriber)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> queue.Queue:
+        """Register a subscriber, replaying events after last_event_id"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            if last_event_id:
+                missed = self._events_after(last_event_id)
+                if missed is None or len(missed) >= self.queue_size:
+                    subscriber.put_nowait(RESYNC_MESSAGE)
+                else:
+                    for message in missed:
+                        subscriber.put_nowait(message)
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        """Remove a subscriber"""
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def stream(self, last_event_id: Optional[str] = None,
+               heartbeat: float = 15.0) -> Iterator[str]:
+        """Yield SSE-formatted messages until the client disconnects"""
+        subscriber = self.subscribe(last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    message = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield message
+                if message is RESYNC_MESSAGE:
+                    return
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _events_after(self, last_event_id: str) -> Optional[List[str]]:
+        """Return buffered messages after an event ID, or None if they are gone"""
+        epoch, _, version = last_event_id.partition('-')
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        last_version = int(version)
+        if self.history and self.history[0][0] > last_version + 1:
+            return None
+        if self.history and self.history[-1][0] < last_version:
+            return None
+        return [message for v, message in self.history if v > last_version]
+
+    @staticmethod
+    def _force_resync(subscriber: queue.Queue):
+        """Replace a full queue's backlog with a single resync event"""
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+        subscriber.put_nowait(RESYNC_MESSAGE)
+
+
+def format_sse(event: Dict) -> str:
+    """Format a change event as a server-sent event message"""
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event)}")
+    return '\n'.join(lines) + '\n\n'
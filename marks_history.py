@@ -0,0 +1,180 @@
+"""
+Marks History
+Append-only log of marks, CGPA and grade changes for every student
+"""
+import bisect
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+class MarksHistory:
+    """Append-only JSON Lines history of marks/CGPA/grade changes
+
+    Each line records the tracked values of one student after one change,
+    together with the time and the acting faculty ID. Lines are positional
+    arrays in RECORD_FIELDS order rather than objects, so the key names are
+    not repeated on every line. Timestamps are stored in UTC with an offset.
+    An in-memory index keeps every student's record offsets sorted by
+    timestamp (whatever order the lines were appended in), so per-student
+    and point-in-time queries seek straight to the lines they need instead
+    of replaying the whole log.
+    """
+
+    TRACKED_FIELDS = ('marks', 'cgpa', 'grade')
+    RECORD_FIELDS = ('timestamp', 'roll_no', 'action', 'faculty_id') + TRACKED_FIELDS
+
+    def __init__(self, history_file: str = 'marks_history.jsonl'):
+        self.history_file = history_file
+        # roll_no -> ([timestamps], [byte offsets]) sorted by time; None timestamps
+        # are baselines and come first
+        self.offsets: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+        self.load_index()
+
+    def load_index(self):
+        """Build the per-student offset index from the history file
+
+        A final line cut short by a crash mid-write is truncated away so
+        later appends start on a fresh line; other unreadable lines are
+        skipped. Both are reported with a warning.
+        """
+        self.offsets = {}
+        if not os.path.exists(self.history_file):
+            return
+        with open(self.history_file, 'rb+') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    print(f"Warning: truncating incomplete last line of {self.history_file} "
+                          f"at byte {offset}")
+                    f.truncate(offset)
+                    break
+                if line.strip():
+                    try:
+                        record = self._decode(line)
+                        self._index(record['roll_no'], self._parse_time(record['timestamp']), offset)
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        print(f"Warning: skipping unreadable line in {self.history_file} "
+                              f"at byte {offset}")
+                offset += len(line)
+
+    def record_add(self, student, faculty_id: Optional[str] = None,
+                   timestamp: Optional[datetime] = None):
+        """Record the initial values of a newly added student"""
+        self._append(student.roll_no, 'add', self.tracked_values(student), faculty_id,
+                     self._utc(timestamp or datetime.now(timezone.utc)))
+
+    def record_update(self, student, previous: Dict, faculty_id: Optional[str] = None,
+                      timestamp: Optional[datetime] = None):
+        """Record a student's values after a change
+
+        previous holds the values before the change; it is stored as an
+        untimed baseline the first time a student without history changes.
+        """
+        if student.roll_no not in self.offsets:
+            self._append(student.roll_no, 'baseline', previous, None, None)
+        self._append(student.roll_no, 'update', self.tracked_values(student), faculty_id,
+                     self._utc(timestamp or datetime.now(timezone.utc)))
+
+    def get_history(self, roll_no: str) -> List[Dict]:
+        """Return every recorded change for a student, oldest first"""
+        if roll_no not in self.offsets:
+            return []
+        return self._read(self.offsets[roll_no][1])
+
+    def get_cgpa_trajectory(self, roll_no: str) -> List[Dict]:
+        """Return (timestamp, cgpa) points for a student, oldest first"""
+        return [{'timestamp': record['timestamp'], 'cgpa': record['cgpa']}
+                for record in self.get_history(roll_no)]
+
+    def values_as_of(self, roll_nos: List[str], when: datetime) -> Dict[str, Dict]:
+        """Return the record in effect at a point in time for each student
+
+        Students without history are left out (their current values have
+        always applied); students added after `when` map to {}. A naive
+        `when` is taken as local time.
+        """
+        when = self._utc(when)
+        found = {}
+        wanted = []
+        for roll_no in roll_nos:
+            if roll_no not in self.offsets:
+                continue
+            timestamps, offsets = self.offsets[roll_no]
+            position = bisect.bisect_right(timestamps, when, lo=self._baseline_count(timestamps))
+            if position == 0:
+                found[roll_no] = {}
+            else:
+                wanted.append((offsets[position - 1], roll_no))
+
+        # Read in file order so the seeks move forward
+        wanted.sort()
+        records = self._read([offset for offset, _ in wanted])
+        for (_, roll_no), record in zip(wanted, records):
+            found[roll_no] = record
+        return found
+
+    def _append(self, roll_no: str, action: str, values: Dict,
+                faculty_id: Optional[str], timestamp: Optional[datetime]):
+        row = [timestamp.isoformat() if timestamp else None, roll_no, action, faculty_id]
+        row.extend(values.get(field) for field in self.TRACKED_FIELDS)
+        line = (json.dumps(row, separators=(',', ':')) + '\n').encode()
+        with self.lock:
+            with open(self.history_file, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            self._index(roll_no, timestamp, offset)
+
+    def _index(self, roll_no: str, timestamp: Optional[datetime], offset: int):
+        timestamps, offsets = self.offsets.setdefault(roll_no, ([], []))
+        position = self._baseline_count(timestamps)
+        if timestamp is not None:
+            # Usually the end; earlier explicit timestamps are slotted into place
+            position = bisect.bisect_right(timestamps, timestamp, lo=position)
+        timestamps.insert(position, timestamp)
+        offsets.insert(position, offset)
+
+    def _read(self, offsets: List[int]) -> List[Dict]:
+        records = []
+        if not offsets:
+            # Nothing to read, and the file may not exist yet
+            return records
+        with open(self.history_file, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(self._decode(f.readline()))
+        return records
+
+    @classmethod
+    def _decode(cls, line: bytes) -> Dict:
+        """Turn a stored line back into a record dict
+        Object lines written by earlier versions are passed through"""
+        row = json.loads(line)
+        if isinstance(row, dict):
+            return row
+        return dict(zip(cls.RECORD_FIELDS, row))
+
+    @staticmethod
+    def _baseline_count(timestamps: List) -> int:
+        """Number of leading untimed baseline entries"""
+        count = 0
+        while count < len(timestamps) and timestamps[count] is None:
+            count += 1
+        return count
+
+    @classmethod
+    def _parse_time(cls, value: Optional[str]) -> Optional[datetime]:
+        return cls._utc(datetime.fromisoformat(value)) if value else None
+
+    @staticmethod
+    def _utc(when: datetime) -> datetime:
+        """Convert to aware UTC so all timestamps compare; naive times are local"""
+        return when.astimezone(timezone.utc)
+
+    @classmethod
+    def tracked_values(cls, student) -> Dict:
+        """Return the tracked fields of a student"""
+        return {field: getattr(student, field) for field in cls.TRACKED_FIELDS}
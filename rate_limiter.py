@@ -0,0 +1,128 @@
+"""
+Rate Limiter
+Token bucket rate limiting with an in-memory LRU store or a shared backend
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class MemoryBucketStore:
+    """Token buckets held in a bounded LRU map
+
+    Buckets are stored as (tokens, last_refill) tuples. When the map is
+    full the least recently used bucket is evicted; an evicted key simply
+    starts again with a full bucket. State is per process, so use a shared
+    store such as RedisBucketStore when running several workers.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.buckets: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, refill_rate: float,
+                cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from a bucket
+        Returns (allowed, seconds until enough tokens are available)"""
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                if len(self.buckets) >= self.max_keys:
+                    self.buckets.popitem(last=False)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                self.buckets.move_to_end(key)
+
+            if tokens >= cost:
+                self.buckets[key] = (tokens - cost, now)
+                return True, 0.0
+            self.buckets[key] = (tokens, now)
+            return False, (cost - tokens) / refill_rate
+
+
+class RedisBucketStore:
+    """Token buckets shared between workers through Redis
+
+    Takes an existing redis-py client, so redis is only needed when this
+    store is used. The refill and consume run atomically in a Lua script.
+    """
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = 'ratelimit:'):
+        self.prefix = prefix
+        self.script = client.register_script(self.SCRIPT)
+
+    def consume(self, key: str, capacity: float, refill_rate: float,
+                cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from a bucket
+        Returns (allowed, seconds until enough tokens are available)"""
+        allowed, tokens = self.script(keys=[self.prefix + key],
+                                      args=[capacity, refill_rate, cost])
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / refill_rate
+
+
+class RateLimiter:
+    """Allows `capacity` requests in a burst, refilled at `refill_rate` per second"""
+
+    def __init__(self, capacity: float, refill_rate: float, store=None, name: str = ''):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.store = store if store is not None else MemoryBucketStore()
+        self.name = name
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, int]:
+        """Consume a token for key
+        Returns (allowed, Retry-After in whole seconds)"""
+        allowed, wait = self.store.consume(f"{self.name}:{key}", self.capacity,
+                                           self.refill_rate, cost)
+        return allowed, 0 if allowed else max(1, math.ceil(wait))
+
+
+def main():
+    """Benchmark the per-request cost of the in-memory limiter"""
+    import itertools
+    import timeit
+
+    print("RATE LIMITER BENCHMARK")
+    print("="*60)
+
+    limiter = RateLimiter(capacity=10, refill_rate=1.0, store=MemoryBucketStore(10000))
+    runs = 200000
+
+    # One hot key (repeat offender) and many keys (LRU churn)
+    hot = timeit.timeit(lambda: limiter.check("203.0.113.7"), number=runs)
+    keys = itertools.cycle([f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(50000)])
+    churn = timeit.timeit(lambda: limiter.check(next(keys)), number=runs)
+
+    print(f"Single key:    {hot / runs * 1e6:.2f} us/request")
+    print(f"50k keys/LRU:  {churn / runs * 1e6:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Report Card Generator
+Renders report cards for a cohort in parallel across a process pool
+"""
+import argparse
+import gzip
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from student_management import Student, StudentManagementSystem
+
+
+FORMATS = ('text', 'html')
+
+TEXT_TEMPLATE = """REPORT CARD
+============================================================
+Roll No: {roll_no}
+Name: {name}
+Marks: {marks}
+CGPA: {cgpa}
+Grade: {grade}
+Attendance: {attendance}%
+Degree: {degree}
+Year of Registration: {year_of_registration}
+Remaining Years: {remaining_years}
+"""
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Report Card - {roll_no}</title>
+</head>
+<body>
+<h1>Report Card</h1>
+<table>
+<tr><th>Roll No</th><td>{roll_no}</td></tr>
+<tr><th>Name</th><td>{name}</td></tr>
+<tr><th>Degree</th><td>{degree}</td></tr>
+<tr><th>Marks</th><td>{marks}</td></tr>
+<tr><th>CGPA</th><td>{cgpa}</td></tr>
+<tr><th>Grade</th><td>{grade}</td></tr>
+<tr><th>Attendance</th><td>{attendance}%</td></tr>
+<tr><th>Year of Registration</th><td>{year_of_registration}</td></tr>
+<tr><th>Remaining Years</th><td>{remaining_years}</td></tr>
+</table>
+</body>
+</html>
+"""
+
+# (path, rows) of the partition file this worker process read last
+_loaded_partition: Tuple[Optional[str], List[Dict]] = (None, [])
+
+
+def report_filename(roll_no: str, fmt: str) -> str:
+    """File name of a student's report card
+
+    Roll numbers that need sanitizing get a checksum of the original
+    appended, so e.g. "2024/01" and "2024_01" don't share a file.
+    """
+    safe_roll = re.sub(r'[^A-Za-z0-9_-]', '_', roll_no)
+    if safe_roll != roll_no:
+        safe_roll += f"-{zlib.crc32(roll_no.encode('utf-8')):08x}"
+    return f"{safe_roll}.{'html' if fmt == 'html' else 'txt'}"
+
+
+def render_report(record: Dict, fmt: str = 'text') -> str:
+    """Render one report card from a stored student row
+
+    Remaining years depend on today's date, so they are recomputed rather
+    than taken from the row.
+    """
+    fields = dict(record, remaining_years=Student.remaining_years_for(
+        record['year_of_registration'], record['degree']))
+    if fmt == 'html':
+        return HTML_TEMPLATE.format(**{key: html.escape(str(value)) for key, value in fields.items()})
+    return TEXT_TEMPLATE.format(**fields)
+
+
+def load_partition(path: str) -> List[Dict]:
+    """Read a partition file's rows, reusing them for this worker's next chunk"""
+    global _loaded_partition
+    if _loaded_partition[0] != path:
+        with open(path, 'r') as f:
+            _loaded_partition = (path, json.load(f))
+    return _loaded_partition[1]
+
+
+def render_chunk(path: str, start: int, stop: int, fmt: str, degree: Optional[str] = None,
+                 output_dir: Optional[str] = None,
+                 segment: Optional[str] = None) -> Tuple[List[str], int]:
+    """Render rows start:stop of a partition file in a worker process
+
+    Report cards go to files in output_dir, or into segment as tar members
+    (gzip-compressed if it ends in .gz) for the parent to join. Returns the
+    file names and the uncompressed size of the segment.
+    """
+    names = []
+    size = 0
+    out = None
+    if segment:
+        out = gzip.open(segment, 'wb', compresslevel=6) if segment.endswith('.gz') \
+            else open(segment, 'wb')
+    try:
+        for record in load_partition(path)[start:stop]:
+            if degree and record['degree'] != degree:
+                continue
+            name = report_filename(record['roll_no'], fmt)
+            content = render_report(record, fmt).encode('utf-8')
+            if out is None:
+                with open(os.path.join(output_dir, name), 'wb') as f:
+                    f.write(content)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mtime = int(time.time())
+                member = info.tobuf() + content + tarfile.NUL * (-len(content) % tarfile.BLOCKSIZE)
+                out.write(member)
+                size += len(member)
+            names.append(name)
+    finally:
+        if out is not None:
+            out.close()
+    return names, size
+
+
+def cohort_partitions(sms: StudentManagementSystem, degree: Optional[str] = None,
+                      year: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Partition files holding a cohort, with their row counts
+
+    A cohort is a registration year, a degree, both, or everyone. With
+    per-degree partitions only the matching files are returned; otherwise
+    the degree is filtered while rendering.
+    """
+    store = sms.store
+    keys = store.keys_for_year(year) if year is not None else sorted(store.manifest)
+    partitions = []
+    for key in keys:
+        info = store.manifest[key]
+        if degree and info['degree'] not in (None, degree):
+            continue
+        partitions.append((os.path.join(store.data_dir, info['file']), info['count']))
+    return partitions
+
+
+def chunk_ranges(partitions: List[Tuple[str, int]],
+                 chunk_size: int) -> Iterator[Tuple[str, int, int]]:
+    """Split partition files into (path, start, stop) row ranges"""
+    for path, count in partitions:
+        for start in range(0, count, chunk_size):
+            yield path, start, min(start + chunk_size, count)
+
+
+def print_progress(done: int, total: int):
+    """Default progress reporter"""
+    percent = done * 100 // total if total else 100
+    print(f"\rProcessed {done}/{total} students ({percent}%)", end='', flush=True)
+    if done == total:
+        print()
+
+
+def generate_report_cards(partitions: List[Tuple[str, int]], output: str, fmt: str = 'text',
+                          workers: Optional[int] = None, chunk_size: int = 500,
+                          degree: Optional[str] = None,
+                          progress: Optional[Callable[[int, int], None]] = print_progress) -> int:
+    """Render report cards for the rows of partition files across a process pool
+
+    partitions is a list of (path, row count), as from cohort_partitions().
+    Workers read their own row ranges from the saved partition files, so
+    the parent only hands out file names and offsets, with at most two
+    chunks in flight per worker. output is a directory, or a tar archive
+    when it ends in .tar, .tar.gz or .tgz; for archives each chunk is
+    written (and compressed) as a separate segment that is joined at the
+    end. progress(done, total) is called as chunks finish, counting rows
+    read. Returns the number of report cards written.
+
+    Raises ValueError if two students map to the same file name.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+
+    archive = output.endswith(('.tar', '.tar.gz', '.tgz'))
+    if archive:
+        output_dir = None
+        segment_dir = tempfile.mkdtemp(prefix='.report_cards_', dir=os.path.dirname(output) or '.')
+        suffix = '.gz' if output.endswith('gz') else ''
+    else:
+        output_dir = output
+        os.makedirs(output_dir, exist_ok=True)
+
+    total = sum(count for _, count in partitions)
+    done = 0
+    names = set()
+    segments: List[Optional[str]] = []
+    sizes: List[int] = []
+    workers = workers or os.cpu_count() or 1
+    # future -> (chunk index, rows in chunk)
+    pending: Dict = {}
+
+    def collect(finished):
+        nonlocal done
+        for future in finished:
+            index, rows = pending.pop(future)
+            chunk_names, sizes[index] = future.result()
+            for name in chunk_names:
+                if name in names:
+                    raise ValueError(f"Report card file name collision: {name}")
+                names.add(name)
+            done += rows
+        if progress:
+            progress(done, total)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path, start, stop in chunk_ranges(partitions, chunk_size):
+                segment = None
+                if archive:
+                    segment = os.path.join(segment_dir, f"{len(segments):06d}.tar{suffix}")
+                future = executor.submit(render_chunk, path, start, stop, fmt, degree,
+                                         output_dir, segment)
+                pending[future] = (len(segments), stop - start)
+                segments.append(segment)
+                sizes.append(0)
+                if len(pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+        if archive:
+            _join_segments(output, segments, sum(sizes), suffix)
+    finally:
+        if archive:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+
+    if progress and total == 0:
+        progress(0, 0)
+    return len(names)
+
+
+def _join_segments(output: str, segments: List[str], size: int, suffix: str):
+    """Concatenate tar segments in order and close the archive
+
+    Concatenated gzip streams form a valid multi-member gzip file, so
+    compressed segments are copied as-is.
+    """
+    # End-of-archive marker, padded to a whole record
+    trailer = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    trailer += tarfile.NUL * (-(size + len(trailer)) % tarfile.RECORDSIZE)
+    with open(output, 'wb') as out:
+        for segment in segments:
+            with open(segment, 'rb') as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+        out.write(gzip.compress(trailer) if suffix else trailer)
+
+
+def main():
+    """Generate report cards from the command line"""
+    parser = argparse.ArgumentParser(description="Generate student report cards")
+    parser.add_argument('--degree', help="only this degree, e.g. B.Tech")
+    parser.add_argument('--year', type=int, help="only this year of registration")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('--output', default='report_cards',
+                        help="output directory, or a .tar/.tar.gz/.tgz archive")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    print("REPORT CARD GENERATOR")
+    print("="*60)
+
+    sms = StudentManagementSystem()
+    partitions = cohort_partitions(sms, args.degree, args.year)
+    start = time.perf_counter()
+    count = generate_report_cards(partitions, args.output, args.format,
+                                  args.workers, args.chunk_size, args.degree)
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed else 0
+    print(f"Wrote {count} report cards to {args.output} in {elapsed:.2f}s ({rate:.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
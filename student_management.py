@@ -2,10 +2,29 @@
 Student Management System
 Manages student records including roll no, name, marks, CGPA, grade, attendance, degree
 """
+import os
 import pickle
 import json
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+from student_search import StudentSearchIndex
+from marks_history import MarksHistory
+from student_store import PartitionedStudentStore
+
+
+DEFAULT_DATA_DIR = 'students_data'
+
+
+def year_from_roll(roll_no: str) -> int:
+    """Extract year of registration from roll number
+    Assuming format: YYYYXXXX where YYYY is year"""
+    try:
+        # Extract first 4 digits as year
+        year = int(roll_no[:4])
+        return year
+    except:
+        return 2024  # Default year
 
 
 class Student:
@@ -40,17 +59,17 @@ class Student:
     def extract_year_from_roll(self) -> int:
         """Extract year of registration from roll number
         Assuming format: YYYYXXXX where YYYY is year"""
-        try:
-            # Extract first 4 digits as year
-            year = int(self.roll_no[:4])
-            return year
-        except:
-            return 2024  # Default year
+        return year_from_roll(self.roll_no)
     
     def get_remaining_years(self) -> int:
         """Calculate remaining years in college based on degree type"""
+        return self.remaining_years_for(self.year_of_registration, self.degree)
+    
+    @staticmethod
+    def remaining_years_for(year_of_registration: int, degree: str) -> int:
+        """Remaining years for a registration year and degree, as of today"""
         current_year = datetime.now().year
-        years_elapsed = current_year - self.year_of_registration
+        years_elapsed = current_year - year_of_registration
         
         # Standard degree durations
         degree_duration = {
@@ -64,7 +83,7 @@ class Student:
             'MCA': 3
         }
         
-        total_years = degree_duration.get(self.degree, 4)  # Default 4 years
+        total_years = degree_duration.get(degree, 4)  # Default 4 years
         remaining = total_years - years_elapsed
         return max(0, remaining)  # Don't return negative values
     
@@ -82,6 +101,18 @@ class Student:
             'remaining_years': self.get_remaining_years()
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Student':
+        """Create a student from a dictionary produced by to_dict"""
+        return cls(
+            data['roll_no'],
+            data['name'],
+            data['marks'],
+            data['cgpa'],
+            data['attendance'],
+            data['degree']
+        )
+    
     def __str__(self) -> str:
         """String representation of student"""
         return f"""
@@ -100,45 +131,204 @@ Remaining Years: {self.get_remaining_years()}
 class StudentManagementSystem:
     """System to manage multiple students"""
     
-    def __init__(self):
-        self.students: List[Student] = []
-        self.data_file = 'students_data.json'
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, partition_by_degree: Optional[bool] = None,
+                 history_file: Optional[str] = None):
+        self.data_dir = data_dir
+        # Layout requested at construction; None keeps whatever the data dir uses
+        self._partition_by_degree = partition_by_degree
+        # Single-file roster from older versions, kept next to the default data_dir
+        # and migrated into it on first run; other data dirs start empty
+        self.data_file = None
+        if data_dir == DEFAULT_DATA_DIR:
+            self.data_file = os.path.join(os.path.dirname(os.path.abspath(data_dir)),
+                                          'students_data.json')
+        self.history = MarksHistory(history_file or os.path.join(data_dir, 'marks_history.jsonl'))
+        self.listeners: List[Callable[[Dict], None]] = []
+        self.version = 0
+        # Serializes publish_change so event versions are unique and reach listeners in order
+        self._change_lock = threading.RLock()
         self.load_students()
     
+    @property
+    def partition_by_degree(self) -> bool:
+        """Whether each year is split further by degree, as stored in the manifest"""
+        return self.store.partition_by_degree
+    
+    @property
+    def students(self) -> List[Student]:
+        """All students (loads every partition)"""
+        return self.store.all_students()
+    
+    @property
+    def search_index(self) -> StudentSearchIndex:
+        """Search index, built from all partitions on first use"""
+        if self._search_index is None:
+            self.build_search_index()
+        return self._search_index
+    
+    def build_search_index(self):
+        """Build the search index once; concurrent callers wait for the first build
+        This loads every partition, so it runs on the first search, not at startup"""
+        with self._search_lock:
+            if self._search_index is None:
+                index = StudentSearchIndex()
+                index.build(self.students)
+                self._search_index = index
+    
+    @property
+    def topper(self) -> Optional[Student]:
+        """Current topper, computed from all partitions on first use"""
+        if not self._topper_loaded:
+            self._topper = self.find_topper()
+            self._topper_loaded = True
+        return self._topper
+    
+    def student_count(self) -> int:
+        """Number of students, without loading any partition"""
+        return self.store.count()
+    
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Register a callback that receives a change event after every mutation"""
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[Dict], None]):
+        """Unregister a change listener"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
     def add_student(self, roll_no: str, name: str, marks: float, cgpa: float, 
-                    attendance: float, degree: str):
+                    attendance: float, degree: str, faculty_id: Optional[str] = None):
         """Add a new student to the system"""
         student = Student(roll_no, name, marks, cgpa, attendance, degree)
-        self.students.append(student)
+        self.store.add(student)
+        with self._search_lock:
+            if self._search_index is not None:
+                self._search_index.add(student)
         self.save_students()
+        self.history.record_add(student, faculty_id)
+        self.publish_change('add', [student])
         return student
     
     def get_student_by_roll(self, roll_no: str) -> Optional[Student]:
-        """Find student by roll number"""
-        for student in self.students:
-            if student.roll_no == roll_no:
-                return student
-        return None
+        """Find student by roll number (only its registration year is loaded)"""
+        return self.store.get(roll_no, year_from_roll(roll_no))
     
-    def update_marks(self, roll_no: str, marks: float, cgpa: float):
+    def update_marks(self, roll_no: str, marks: float, cgpa: float,
+                     faculty_id: Optional[str] = None):
         """Update marks and CGPA for a student"""
         student = self.get_student_by_roll(roll_no)
         if student:
+            self.store.mark_dirty(student)
+            previous = MarksHistory.tracked_values(student)
             student.marks = marks
             student.cgpa = cgpa
             student.grade = student.calculate_grade()
             self.save_students()
+            self.history.record_update(student, previous, faculty_id)
+            self.publish_change('update', [student])
             return True
         return False
     
+    def update_marks_bulk(self, updates: List[Dict], faculty_id: Optional[str] = None) -> int:
+        """Apply several marks/CGPA updates with a single save and change event
+        Each update is a dict with 'roll_no' and optional 'marks' and 'cgpa'
+        Nothing is changed if any of the students is in a frozen partition"""
+        found = []
+        for update in updates:
+            student = self.get_student_by_roll(update.get('roll_no'))
+            if student:
+                self.store.check_writable(student)
+                found.append((student, update))
+        
+        changed = []
+        previous_values = []
+        for student, update in found:
+            self.store.mark_dirty(student)
+            previous_values.append(MarksHistory.tracked_values(student))
+            if update.get('marks') is not None:
+                student.marks = update['marks']
+            if update.get('cgpa') is not None:
+                student.cgpa = update['cgpa']
+                student.grade = student.calculate_grade()
+            changed.append(student)
+        
+        self.save_students()
+        for student, previous in zip(changed, previous_values):
+            self.history.record_update(student, previous, faculty_id)
+        if changed:
+            self.publish_change('update', changed)
+        return len(changed)
+    
+    def get_marks_history(self, roll_no: str) -> List[Dict]:
+        """Get every recorded marks/CGPA change for a student, oldest first"""
+        return self.history.get_history(roll_no)
+    
+    def get_students_as_of(self, when: datetime) -> List[Dict]:
+        """Get the roster as it stood at a point in time
+        Students added later are left out; marks, CGPA and grade come from history"""
+        students = self.students
+        history = self.history.values_as_of([s.roll_no for s in students], when)
+        roster = []
+        for student in students:
+            data = student.to_dict()
+            values = history.get(student.roll_no)
+            if values == {}:
+                continue
+            if values:
+                for field in MarksHistory.TRACKED_FIELDS:
+                    data[field] = values[field]
+            roster.append(data)
+        return roster
+    
+    def publish_change(self, change_type: str, changed: List[Student]):
+        """Bump the data version, refresh the topper and notify listeners
+        Runs under one lock, so listeners should return quickly"""
+        with self._change_lock:
+            self.version += 1
+            self.refresh_topper(changed)
+            if not self.listeners:
+                return
+            
+            event = {
+                'type': change_type,
+                'version': self.version,
+                'students': [student.to_dict() for student in changed],
+                'topper': self.topper.to_dict() if self.topper else None
+            }
+            for listener in list(self.listeners):
+                listener(event)
+    
+    def refresh_topper(self, changed: List[Student]):
+        """Update the cached topper from the changed students only
+        Falls back to a full scan when the current topper itself changed"""
+        if not self._topper_loaded:
+            # Not computed yet, the first read will see the changes
+            return
+        topper = self._topper
+        if topper is not None and any(s is topper for s in changed):
+            self._topper = self.find_topper()
+            return
+        
+        for student in changed:
+            if student.attendance < 75:
+                continue
+            if topper is None or (student.cgpa, student.attendance) > (topper.cgpa, topper.attendance):
+                topper = student
+        self._topper = topper
+    
+    def search_students(self, query: str, limit: int = 20) -> List[Student]:
+        """Search students by name or roll number (prefix and typo tolerant)"""
+        return self.search_index.search(query, limit)
+    
     def find_topper(self) -> Optional[Student]:
         """Find topper based on attendance and CGPA
         Priority: CGPA first, then attendance as tiebreaker"""
-        if not self.students:
+        students = self.students
+        if not students:
             return None
         
         # Filter students with minimum 75% attendance
-        eligible_students = [s for s in self.students if s.attendance >= 75]
+        eligible_students = [s for s in students if s.attendance >= 75]
         
         if not eligible_students:
             return None
@@ -152,45 +342,43 @@ class StudentManagementSystem:
         return [s for s in self.students if course_code in s.degree]
     
     def get_students_by_year(self, year: int) -> List[Student]:
-        """Get students by year of registration"""
-        return [s for s in self.students if s.year_of_registration == year]
+        """Get students by year of registration (only that year is loaded)"""
+        return self.store.students_for_year(year)
+    
+    def freeze_year(self, year: int, frozen: bool = True):
+        """Make a cohort read-only, e.g. once it has graduated"""
+        self.store.freeze(year, frozen)
     
     def display_all_students(self):
         """Display all students"""
-        if not self.students:
+        students = self.students
+        if not students:
             print("No students in the system.")
             return
         
         print("\n" + "="*60)
         print("ALL STUDENTS")
         print("="*60)
-        for student in self.students:
+        for student in students:
             print(student)
             print("-"*60)
     
     def save_students(self):
-        """Save students data to JSON file"""
-        data = [student.to_dict() for student in self.students]
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        """Save changed partitions to their JSON files"""
+        self.store.save()
     
     def load_students(self):
-        """Load students data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                for student_data in data:
-                    student = Student(
-                        student_data['roll_no'],
-                        student_data['name'],
-                        student_data['marks'],
-                        student_data['cgpa'],
-                        student_data['attendance'],
-                        student_data['degree']
-                    )
-                    self.students.append(student)
-        except FileNotFoundError:
-            print("No existing student data found. Starting fresh.")
+        """Open the partitioned student store; partitions load on first access"""
+        self.store = PartitionedStudentStore(
+            self.data_dir,
+            Student.from_dict,
+            partition_by_degree=self._partition_by_degree,
+            legacy_file=self.data_file
+        )
+        self._search_index: Optional[StudentSearchIndex] = None
+        self._search_lock = threading.Lock()
+        self._topper: Optional[Student] = None
+        self._topper_loaded = False
 
 
 def create_sample_students():
@@ -210,7 +398,8 @@ def create_sample_students():
     ]
     
     for roll, name, marks, cgpa, attendance, degree in sample_data:
-        sms.add_student(roll, name, marks, cgpa, attendance, degree)
+        if sms.get_student_by_roll(roll) is None:
+            sms.add_student(roll, name, marks, cgpa, attendance, degree)
     
     return sms
 
@@ -0,0 +1,300 @@
+"""
+Student Search Index
+Prefix and typo-tolerant search over student names and roll numbers
+"""
+import bisect
+import heapq
+import itertools
+import unicodedata
+from typing import Dict, Iterator, List, Set, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and strip diacritics (e.g. 'Ánjali' -> 'anjali')"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized alphanumeric tokens"""
+    tokens = []
+    current = []
+    for ch in normalize_text(text):
+        if ch.isalnum():
+            current.append(ch)
+        elif current:
+            tokens.append(''.join(current))
+            current = []
+    if current:
+        tokens.append(''.join(current))
+    return tokens
+
+
+def trigrams(token: str) -> Set[str]:
+    """Return the padded trigrams of a token"""
+    padded = f"$${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Levenshtein distance, giving up once it exceeds max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class StudentSearchIndex:
+    """Inverted index over student names and roll numbers
+
+    Every distinct token keeps a posting list of roll numbers sorted by
+    (name, roll_no), so the best matches of a token are simply its first
+    entries. Prefix matches come from a sorted token list (bisect),
+    typo-tolerant matches from a trigram index over the distinct name
+    tokens (roll numbers are matched by prefix only).
+    """
+
+    # Match scores, higher is better
+    EXACT_SCORE = 3.0
+    PREFIX_SCORE = 2.0
+    FUZZY_SCORE = 1.0
+    # Cap on distinct tokens a single prefix term expands to
+    MAX_PREFIX_EXPANSIONS = 1000
+
+    def __init__(self):
+        self.postings: Dict[str, List[str]] = {}
+        self.sorted_tokens: List[str] = []
+        self.trigram_index: Dict[str, Set[str]] = {}
+        # roll_no -> (student, tokens, (name, roll_no) sort key as indexed)
+        self.documents: Dict[str, Tuple[object, Tuple[str, ...], Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def build(self, students):
+        """Rebuild the index from a list of students"""
+        self.postings = {}
+        self.trigram_index = {}
+        self.documents = {}
+        for student in students:
+            tokens = self._student_tokens(student)
+            for token in tokens:
+                self.postings.setdefault(token, []).append(student.roll_no)
+            self.documents[student.roll_no] = (student, tokens, (student.name, student.roll_no))
+        for posting in self.postings.values():
+            posting.sort(key=self._sort_key)
+        self.sorted_tokens = sorted(self.postings)
+        for token in self.sorted_tokens:
+            if token.isdigit():
+                continue
+            self._index_trigrams(token)
+
+    def add(self, student):
+        """Index a student, replacing any previous entry for the roll number"""
+        if student.roll_no in self.documents:
+            self.remove(student.roll_no)
+        tokens = self._student_tokens(student)
+        self.documents[student.roll_no] = (student, tokens, (student.name, student.roll_no))
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = []
+                bisect.insort(self.sorted_tokens, token)
+                if not token.isdigit():
+                    self._index_trigrams(token)
+            bisect.insort(posting, student.roll_no, key=self._sort_key)
+
+    def update(self, student):
+        """Re-index a student after its name or roll number changed"""
+        self.add(student)
+
+    def remove(self, roll_no: str):
+        """Drop a student from the index"""
+        document = self.documents.get(roll_no)
+        if document is None:
+            return
+        _, tokens, sort_key = document
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            position = bisect.bisect_left(posting, sort_key, key=self._sort_key)
+            if position < len(posting) and posting[position] == roll_no:
+                del posting[position]
+            if not posting:
+                del self.postings[token]
+                position = bisect.bisect_left(self.sorted_tokens, token)
+                if position < len(self.sorted_tokens) and self.sorted_tokens[position] == token:
+                    del self.sorted_tokens[position]
+                for gram in trigrams(token):
+                    grams = self.trigram_index.get(gram)
+                    if grams is not None:
+                        grams.discard(token)
+                        if not grams:
+                            del self.trigram_index[gram]
+        del self.documents[roll_no]
+
+    def search(self, query: str, limit: int = 20) -> List:
+        """Return students matching every query term, best first
+
+        A term matches a token exactly, as a prefix, or within a small
+        edit distance (1 for terms of 4+ characters, 2 for 8+). Students
+        are ranked by their summed match scores, then by name.
+        """
+        terms = tokenize(query)
+        if not terms or limit <= 0:
+            return []
+        if len(terms) == 1:
+            roll_nos = self._search_term(terms[0], limit)
+        else:
+            roll_nos = self._search_terms(terms, limit)
+        return [self.documents[roll_no][0] for roll_no in roll_nos]
+
+    def _search_term(self, term: str, limit: int) -> List[str]:
+        """Top roll numbers for a single term, walking exact, prefix then fuzzy tiers
+
+        Posting lists are already sorted by name, so each tier is a lazy
+        merge of its lists and the walk stops as soon as limit is reached;
+        lower tiers are not even expanded.
+        """
+        results = []
+        seen = set()
+        for tier in self._term_tiers(term):
+            postings = [self.postings[token] for token in tier]
+            for roll_no in heapq.merge(*postings, key=self._sort_key):
+                if roll_no in seen:
+                    continue
+                seen.add(roll_no)
+                results.append(roll_no)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _term_tiers(self, term: str) -> Iterator[List[str]]:
+        """Matched tokens grouped best tier first, each group computed on demand"""
+        if term in self.postings:
+            yield [term]
+        yield [token for token in self._prefix_tokens(term) if token != term]
+        fuzzy = self._fuzzy_tokens(term)
+        for distance in sorted(set(fuzzy.values())):
+            yield [token for token, d in fuzzy.items() if d == distance]
+
+    def _search_terms(self, terms: List[str], limit: int) -> List[str]:
+        """Top roll numbers matching every one of several terms
+
+        Candidates are narrowed with set operations starting from the most
+        selective term. Each term's candidates are then split by match
+        tier, and tier combinations are visited best total score first, so
+        only the groups needed to fill limit are sorted by name.
+        """
+        matched = [self._match_tokens(term) for term in terms]
+        matched.sort(key=lambda tokens: sum(len(self.postings[t]) for t in tokens))
+        candidates = None
+        for tokens in matched:
+            size = sum(len(self.postings[t]) for t in tokens)
+            if candidates is None:
+                candidates = set().union(*(self.postings[t] for t in tokens))
+            elif len(candidates) * 20 < size:
+                # Few candidates: checking their tokens beats scanning the postings
+                candidates = {roll_no for roll_no in candidates
+                              if any(t in tokens for t in self.documents[roll_no][1])}
+            else:
+                narrowed = set()
+                for t in tokens:
+                    narrowed |= candidates.intersection(self.postings[t])
+                candidates = narrowed
+            if not candidates:
+                return []
+
+        # Per term, (score, students) groups with each student in its best tier only
+        term_tiers = []
+        for tokens in matched:
+            by_score: Dict[float, Set[str]] = {}
+            for token, score in tokens.items():
+                by_score.setdefault(score, set()).update(candidates.intersection(self.postings[token]))
+            assigned: Set[str] = set()
+            tiers = []
+            for score in sorted(by_score, reverse=True):
+                group = by_score[score] - assigned
+                if group:
+                    assigned |= group
+                    tiers.append((score, group))
+            term_tiers.append(tiers)
+
+        combos = sorted(itertools.product(*term_tiers),
+                        key=lambda combo: -sum(score for score, _ in combo))
+        results: List[str] = []
+        for _, same_score in itertools.groupby(combos, key=lambda combo: sum(score for score, _ in combo)):
+            members: Set[str] = set()
+            for combo in same_score:
+                members |= set.intersection(*(group for _, group in combo))
+            results.extend(heapq.nsmallest(limit - len(results), members, key=self._sort_key))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _match_tokens(self, term: str) -> Dict[str, float]:
+        """Score every indexed token matched by a term"""
+        matches = {token: self.PREFIX_SCORE for token in self._prefix_tokens(term)}
+        if term in matches:
+            matches[term] = self.EXACT_SCORE
+        for token, distance in self._fuzzy_tokens(term).items():
+            matches[token] = self.FUZZY_SCORE - 0.25 * (distance - 1)
+        return matches
+
+    def _prefix_tokens(self, term: str) -> List[str]:
+        """Indexed tokens starting with term (capped), in sorted order"""
+        tokens = []
+        position = bisect.bisect_left(self.sorted_tokens, term)
+        end = min(len(self.sorted_tokens), position + self.MAX_PREFIX_EXPANSIONS)
+        while position < end:
+            token = self.sorted_tokens[position]
+            if not token.startswith(term):
+                break
+            tokens.append(token)
+            position += 1
+        return tokens
+
+    def _fuzzy_tokens(self, term: str) -> Dict[str, int]:
+        """Name tokens within the allowed edit distance that are not prefix matches"""
+        found: Dict[str, int] = {}
+        max_distance = 2 if len(term) >= 8 else 1 if len(term) >= 4 else 0
+        if not max_distance or term.isdigit():
+            return found
+        candidates: Dict[str, int] = {}
+        for gram in trigrams(term):
+            for token in self.trigram_index.get(gram, ()):
+                candidates[token] = candidates.get(token, 0) + 1
+        # A term has len + 1 padded trigrams and each edit destroys at most three
+        required = len(term) + 1 - 3 * max_distance
+        for token, shared in candidates.items():
+            if shared < required or token.startswith(term):
+                continue
+            distance = edit_distance(term, token, max_distance)
+            if distance <= max_distance:
+                found[token] = distance
+        return found
+
+    def _sort_key(self, roll_no: str) -> Tuple[str, str]:
+        return self.documents[roll_no][2]
+
+    def _index_trigrams(self, token: str):
+        for gram in trigrams(token):
+            self.trigram_index.setdefault(gram, set()).add(token)
+
+    @staticmethod
+    def _student_tokens(student) -> Tuple[str, ...]:
+        tokens = tokenize(student.name) + tokenize(student.roll_no)
+        return tuple(dict.fromkeys(tokens))
@@ -0,0 +1,211 @@
+"""
+Partitioned Student Store
+Keeps student records in one JSON file per registration year (optionally per degree)
+"""
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class PartitionedStudentStore:
+    """Student records split into per-cohort JSON files
+
+    A manifest (partitions.json) lists every partition with its year,
+    degree, student count and frozen flag. Partition files are only read
+    when a partition is first accessed, and save() rewrites only the
+    partitions that changed. Frozen partitions (e.g. graduated cohorts)
+    are read-only. Passing partition_by_degree for an existing store with
+    the other layout repartitions it; None keeps the stored layout.
+    """
+
+    MANIFEST_FILE = 'partitions.json'
+
+    def __init__(self, data_dir: str, loader: Callable[[Dict], object],
+                 partition_by_degree: Optional[bool] = None,
+                 legacy_file: Optional[str] = None):
+        self.data_dir = data_dir
+        self.loader = loader
+        self.partition_by_degree = bool(partition_by_degree)
+        # key -> {'year', 'degree', 'file', 'count', 'frozen'}
+        self.manifest: Dict[str, Dict] = {}
+        # key -> {roll_no: student}, only for partitions loaded so far
+        self.partitions: Dict[str, Dict[str, object]] = {}
+        self.dirty = set()
+        self.lock = threading.RLock()
+        self.load_manifest(legacy_file)
+        if partition_by_degree is not None and partition_by_degree != self.partition_by_degree:
+            self.repartition(partition_by_degree)
+
+    def load_manifest(self, legacy_file: Optional[str] = None):
+        """Read the manifest, migrating a single-file roster on first run"""
+        path = os.path.join(self.data_dir, self.MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.partition_by_degree = data.get('partition_by_degree', False)
+            self.manifest = data['partitions']
+            return
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        if legacy_file and os.path.exists(legacy_file):
+            with open(legacy_file, 'r') as f:
+                rows = json.load(f)
+            # Old rosters could hold a roll number more than once; the last row won lookups
+            by_roll = {student_data['roll_no']: student_data for student_data in rows}
+            if len(by_roll) < len(rows):
+                print(f"Dropped {len(rows) - len(by_roll)} duplicate roll number rows "
+                      f"from {legacy_file}, keeping the last of each")
+            for student_data in by_roll.values():
+                self._place(self.loader(student_data))
+            print(f"Migrated {legacy_file} into partitions in {self.data_dir}/")
+        self.save()
+
+    def partition_key(self, year: int, degree: Optional[str] = None) -> str:
+        """Name of the partition holding a year (and degree)"""
+        if self.partition_by_degree and degree:
+            return f"{year}_{re.sub(r'[^A-Za-z0-9.]+', '_', degree)}"
+        return str(year)
+
+    def keys_for_year(self, year: int) -> List[str]:
+        """Partitions holding students registered in a year"""
+        return [key for key, info in self.manifest.items() if info['year'] == year]
+
+    def get_partition(self, key: str) -> Dict[str, object]:
+        """Return a partition's students by roll number, loading it if needed"""
+        partition = self.partitions.get(key)
+        if partition is not None:
+            return partition
+        with self.lock:
+            if key not in self.partitions:
+                partition = {}
+                info = self.manifest.get(key)
+                if info is not None:
+                    with open(os.path.join(self.data_dir, info['file']), 'r') as f:
+                        for student_data in json.load(f):
+                            student = self.loader(student_data)
+                            partition[student.roll_no] = student
+                self.partitions[key] = partition
+            return self.partitions[key]
+
+    def get(self, roll_no: str, year: int) -> Optional[object]:
+        """Find a student by roll number within its registration year"""
+        for key in self.keys_for_year(year):
+            student = self.get_partition(key).get(roll_no)
+            if student is not None:
+                return student
+        return None
+
+    def students_for_year(self, year: int) -> List:
+        """All students registered in a year"""
+        students = []
+        for key in self.keys_for_year(year):
+            students.extend(self.get_partition(key).values())
+        return students
+
+    def all_students(self) -> List:
+        """All students, loading every partition"""
+        students = []
+        for key in sorted(self.manifest):
+            students.extend(self.get_partition(key).values())
+        return students
+
+    def count(self) -> int:
+        """Total number of students, from the manifest"""
+        return sum(info['count'] for info in self.manifest.values())
+
+    def add(self, student):
+        """Add a student to its partition
+        Raises ValueError if the roll number is already taken"""
+        key = self.partition_key(student.year_of_registration, student.degree)
+        with self.lock:
+            if self.get(student.roll_no, student.year_of_registration) is not None:
+                raise ValueError(f"Student with roll number {student.roll_no} already exists")
+            self._check_writable(key)
+            self._place(student)
+
+    def mark_dirty(self, student):
+        """Flag a changed student's partition for the next save"""
+        key = self.partition_key(student.year_of_registration, student.degree)
+        self._check_writable(key)
+        self.dirty.add(key)
+
+    def check_writable(self, student):
+        """Raise if a student's partition is frozen"""
+        self._check_writable(self.partition_key(student.year_of_registration, student.degree))
+
+    def freeze(self, year: int, frozen: bool = True):
+        """Make every partition of a year read-only (or writable again)"""
+        with self.lock:
+            for key in self.keys_for_year(year):
+                self.manifest[key]['frozen'] = frozen
+            self._write_manifest()
+
+    def repartition(self, partition_by_degree: bool):
+        """Regroup every student into per-year or per-year-and-degree partitions
+
+        Frozen years stay frozen. Files of partitions that no longer exist
+        are removed after the new manifest is written.
+        """
+        with self.lock:
+            students = self.all_students()
+            frozen_years = {info['year'] for info in self.manifest.values() if info['frozen']}
+            old_files = {info['file'] for info in self.manifest.values()}
+            self.partition_by_degree = partition_by_degree
+            self.manifest, self.partitions, self.dirty = {}, {}, set()
+            for student in students:
+                self._place(student)
+            for info in self.manifest.values():
+                info['frozen'] = info['year'] in frozen_years
+            self.save()
+            for filename in old_files - {info['file'] for info in self.manifest.values()}:
+                os.remove(os.path.join(self.data_dir, filename))
+        layout = 'year and degree' if partition_by_degree else 'year'
+        print(f"Repartitioned {self.data_dir}/ by {layout}")
+
+    def save(self):
+        """Write the dirty partitions and the manifest"""
+        with self.lock:
+            for key in sorted(self.dirty):
+                students = self.partitions.get(key, {}).values()
+                self._write_json(self.manifest[key]['file'],
+                                 [student.to_dict() for student in students])
+            self.dirty.clear()
+            self._write_manifest()
+
+    def _place(self, student):
+        """Put a student in its partition, creating the partition if needed"""
+        key = self.partition_key(student.year_of_registration, student.degree)
+        if key not in self.manifest:
+            self.manifest[key] = {
+                'year': student.year_of_registration,
+                'degree': student.degree if self.partition_by_degree else None,
+                'file': f"students_{key}.json",
+                'count': 0,
+                'frozen': False
+            }
+            self.partitions[key] = {}
+        partition = self.get_partition(key)
+        partition[student.roll_no] = student
+        self.manifest[key]['count'] = len(partition)
+        self.dirty.add(key)
+
+    def _check_writable(self, key: str):
+        info = self.manifest.get(key)
+        if info is not None and info['frozen']:
+            raise PermissionError(f"Partition {key} is frozen (read-only)")
+
+    def _write_manifest(self):
+        self._write_json(self.MANIFEST_FILE, {
+            'partition_by_degree': self.partition_by_degree,
+            'partitions': self.manifest
+        })
+
+    def _write_json(self, filename: str, data):
+        """Write a file in the data directory, replacing it atomically"""
+        path = os.path.join(self.data_dir, filename)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(temp_path, path)